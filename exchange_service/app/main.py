@@ -1,14 +1,19 @@
+import asyncio
 import datetime
 import json
 import logging
 import os
+import time
 import uuid
+from contextlib import asynccontextmanager
 from typing import List, Optional
 
 import httpx
-import redis
+import redis.asyncio as redis
+from celery import Celery
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, EmailStr, ValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, EmailStr, TypeAdapter, ValidationError
 
 from .models import (
     RequestCreate,
@@ -21,95 +26,248 @@ from .models import (
     TaskStartRequest,
 )
 
-app = FastAPI()
-
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
     level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 logger = logging.getLogger("exchange_service")
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "redis"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
-)
+# Redis connection pool; a request waits up to REDIS_POOL_TIMEOUT seconds
+# for a free connection before failing
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", 20))
+REDIS_SOCKET_PATH = os.getenv("REDIS_SOCKET_PATH")
+if REDIS_SOCKET_PATH:
+    redis_pool = redis.BlockingConnectionPool(
+        connection_class=redis.UnixDomainSocketConnection,
+        path=REDIS_SOCKET_PATH,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+else:
+    redis_pool = redis.BlockingConnectionPool(
+        host=os.getenv("REDIS_HOST", "redis"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Return the tasks in the intersection of the given index sets in one
+# round-trip, as a flat list of alternating task IDs and HGETALL replies.
+LIST_TASKS_SCRIPT = redis_client.register_script("""
+local ids = redis.call('SINTER', unpack(KEYS))
+local out = {}
+for _, id in ipairs(ids) do
+    out[#out + 1] = id
+    out[#out + 1] = redis.call('HGETALL', 'task:' .. id)
+end
+return out
+""")
+
+# Background jobs run on a Celery worker with Redis as the broker, kept in
+# a separate database from the task and user hashes
+celery = Celery("exchange", broker=os.getenv(
+    "CELERY_BROKER_URL",
+    f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', 6379)}/1"
+))
 
 # Configuration
 USER_SERVICE_URL = os.getenv(
     "USER_SERVICE_URL", "http://user_profile_service:8000")
 
+# Pooled client for the worker's credit transfers
+worker_user_client = httpx.Client(base_url=USER_SERVICE_URL, timeout=5.0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one pooled HTTP client to user_profile_service per process."""
+    app.state.user_client = httpx.AsyncClient(
+        base_url=USER_SERVICE_URL,
+        limits=httpx.Limits(max_connections=100,
+                            max_keepalive_connections=50),
+        timeout=5.0
+    )
+    yield
+    await app.state.user_client.aclose()
+
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Fields needed to validate a state transition before touching the full hash
+_GUARD_FIELDS = ("state", "requested_by_user_id",
+                 "accepted_by_user_id", "time_credit_offer")
+
+# Built once so list_tasks can serialize without FastAPI's per-call path
+_TASK_LIST_ADAPTER = TypeAdapter(List[RequestResponse])
+
+# Attempts at a guarded state transition before reporting a conflict
+_TRANSITION_RETRIES = 3
+
+# States from which the creator may still cancel a task
+_CANCELLABLE_STATES = frozenset({RequestState.OPEN, RequestState.PENDING})
+
 # Helper functions
 
 
-def _get_task_from_redis(task_id: str) -> dict:
+def _now_ms() -> int:
+    """Current UTC time as integer epoch milliseconds, as stored in Redis."""
+    return time.time_ns() // 1_000_000
+
+
+def _ms_to_datetime(ms: str) -> datetime.datetime:
+    """Convert an epoch-millisecond Redis field to a UTC datetime."""
+    return datetime.datetime.fromtimestamp(int(ms) / 1000, tz=datetime.timezone.utc)
+
+
+async def _get_task_fields(task_id: str, *fields: str) -> dict:
+    """Retrieve only the given fields of a task from Redis by ID."""
+    values = await redis_client.hmget(f"task:{task_id}", fields)
+    if all(value is None for value in values):
+        return None
+    return dict(zip(fields, values))
+
+
+async def _get_task_from_redis(task_id: str) -> dict:
     """Retrieve task from Redis by ID."""
-    task_data = redis_client.hgetall(f"task:{task_id}")
+    task_data = await redis_client.hgetall(f"task:{task_id}")
     if not task_data:
         return None
     return task_data
 
 
-def _task_dict_to_response(task_id: str, task_data: dict) -> RequestResponse:
-    """Convert Redis hash to RequestResponse."""
-    return RequestResponse(
+# Globals are bound as defaults since this runs once per item in list_tasks
+def _task_dict_to_response(
+    task_id: str,
+    task_data: dict,
+    _construct=RequestResponse.model_construct,
+    _to_datetime=_ms_to_datetime,
+    _state=RequestState,
+    _int=int
+) -> RequestResponse:
+    """Convert Redis hash to RequestResponse without re-validating it."""
+    return _construct(
         id=task_id,
         title=task_data["title"],
         description=task_data["description"],
         requested_by_user_id=task_data["requested_by_user_id"],
-        accepted_by_user_id=task_data.get("accepted_by_user_id"),
-        time_credit_offer=int(task_data["time_credit_offer"]),
-        state=task_data["state"],
-        created_at=datetime.datetime.fromisoformat(task_data["created_at"]),
-        updated_at=datetime.datetime.fromisoformat(task_data["updated_at"])
+        accepted_by_user_id=task_data.get("accepted_by_user_id") or None,
+        time_credit_offer=_int(task_data["time_credit_offer"]),
+        state=_state(task_data["state"]),
+        created_at=_to_datetime(task_data["created_at"]),
+        updated_at=_to_datetime(task_data["updated_at"])
     )
 
 
+async def _save_task_transition(task_id: str, from_state: str, updates: dict) -> dict:
+    """Apply updates if the task is still in from_state, moving its state index.
+
+    The write is retried if another client touches the task between the
+    state check and EXEC. Returns the updated task hash, or None if the
+    task is no longer in from_state.
+    """
+    key = f"task:{task_id}"
+    async with redis_client.pipeline() as pipe:
+        for _ in range(_TRANSITION_RETRIES):
+            try:
+                await pipe.watch(key)
+                if await pipe.hget(key, "state") != from_state:
+                    await pipe.unwatch()
+                    return None
+                pipe.multi()
+                pipe.hset(key, mapping=updates)
+                pipe.srem(f"tasks:by_state:{from_state}", task_id)
+                pipe.sadd(f"tasks:by_state:{updates['state']}", task_id)
+                if updates.get("accepted_by_user_id"):
+                    pipe.sadd(
+                        f"tasks:by_acceptor:{updates['accepted_by_user_id']}", task_id)
+                pipe.hgetall(key)
+                return (await pipe.execute())[-1]
+            except redis.WatchError:
+                continue
+    return None
+
+
 async def _validate_user_exists(user_id: str) -> bool:
     """Check if user exists in user_profile_service."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{USER_SERVICE_URL}/users/{user_id}", timeout=5.0)
-            exists = response.status_code == 200
-            if not exists:
-                logger.info(
-                    "event=validate_user_exists user_id=%s exists=%s", user_id, exists)
-            return exists
+        client = app.state.user_client
+        response = await client.get(f"/users/{user_id}")
+        exists = response.status_code == 200
+        if not exists:
+            logger.info(
+                "event=validate_user_exists user_id=%s exists=%s", user_id, exists)
+        return exists
     except Exception as e:
         logger.exception("Error validating user: %s", e)
         return False
 
 
-async def _transfer_credits(from_user_id: str, to_user_id: str, amount: int) -> bool:
+def _transfer_credits(from_user_id: str, to_user_id: str, amount: int) -> bool:
     """Transfer credits via user_profile_service."""
     try:
-        async with httpx.AsyncClient() as client:
-            logger.info("event=transfer_request from=%s to=%s amount=%s",
-                        from_user_id, to_user_id, amount)
-            response = await client.post(
-                f"{USER_SERVICE_URL}/users/transfer",
-                json={"from_user_id": from_user_id,
-                      "to_user_id": to_user_id, "amount": amount},
-                timeout=5.0
-            )
-            success = response.status_code == 200
-            if success:
-                logger.info("event=transfer_success from=%s to=%s amount=%s",
-                            from_user_id, to_user_id, amount)
-            else:
-                logger.info("event=transfer_failed from=%s to=%s amount=%s status=%s",
-                            from_user_id, to_user_id, amount, response.status_code)
-            return success
+        logger.debug("event=transfer_request from=%s to=%s amount=%s",
+                     from_user_id, to_user_id, amount)
+        response = worker_user_client.post(
+            "/users/transfer",
+            json={"from_user_id": from_user_id,
+                  "to_user_id": to_user_id, "amount": amount}
+        )
+        success = response.status_code == 200
+        if success:
+            logger.debug("event=transfer_success from=%s to=%s amount=%s",
+                         from_user_id, to_user_id, amount)
+        else:
+            logger.info("event=transfer_failed from=%s to=%s amount=%s status=%s",
+                        from_user_id, to_user_id, amount, response.status_code)
+        return success
     except Exception as e:
         logger.exception("Error transferring credits: %s", e)
         return False
 
+
+async def _settle_completion(task_id: str, state: RequestState) -> dict:
+    """Move a completing task to its final state from a worker event loop."""
+    try:
+        return await _save_task_transition(task_id, RequestState.COMPLETING, {
+            "state": state,
+            "updated_at": _now_ms()
+        })
+    finally:
+        # Pooled connections are bound to this loop, which asyncio.run closes
+        await redis_pool.disconnect()
+
+
+@celery.task(ignore_result=True, autoretry_for=(redis.RedisError,),
+             retry_backoff=True, max_retries=5)
+def settle_completion(task_id: str, state: str) -> None:
+    """Settle a completing task; retried on Redis errors without re-transferring."""
+    if not asyncio.run(_settle_completion(task_id, RequestState(state))):
+        logger.error("event=settle_completion_failed task_id=%s state=%s",
+                     task_id, state)
+
+
+@celery.task(ignore_result=True)
+def transfer_and_finalize(task_id: str, from_user_id: str, to_user_id: str, amount: int) -> None:
+    """Transfer credits for a completing task, then settle its final state.
+
+    On failure the task returns to in_progress so completion can be retried.
+    """
+    if _transfer_credits(from_user_id, to_user_id, amount):
+        logger.debug("event=complete_task task_id=%s", task_id)
+        settle_completion.delay(task_id, RequestState.COMPLETED)
+    else:
+        logger.info("event=complete_task_transfer_failed task_id=%s", task_id)
+        settle_completion.delay(task_id, RequestState.IN_PROGRESS)
+
 # API Endpoints
 
 
 @app.get("/health")
 async def health_check():
-    logger.info("event=health_check service=exchange_service")
     return {
         "service": "exchange_service",
         "status": "healthy",
@@ -140,10 +298,10 @@ async def create_task(task_create: RequestCreate):
     if not await _validate_user_exists(task_create.requested_by_user_id):
         raise HTTPException(status_code=404, detail="Requested user not found")
 
-    task_id = str(uuid.uuid4())
-    logger.info("event=create_task task_id=%s requested_by=%s offer=%s",
-                task_id, task_create.requested_by_user_id, task_create.time_credit_offer)
-    now = datetime.datetime.now(datetime.timezone.utc)
+    task_id = uuid.uuid4().hex
+    logger.debug("event=create_task task_id=%s requested_by=%s offer=%s",
+                 task_id, task_create.requested_by_user_id, task_create.time_credit_offer)
+    now_ms = _now_ms()
 
     task_data = {
         "id": task_id,
@@ -153,12 +311,17 @@ async def create_task(task_create: RequestCreate):
         "accepted_by_user_id": "",
         "time_credit_offer": task_create.time_credit_offer,
         "state": RequestState.OPEN,
-        "created_at": now.isoformat(),
-        "updated_at": now.isoformat()
+        "created_at": now_ms,
+        "updated_at": now_ms
     }
 
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    redis_client.sadd("tasks:all", task_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(f"task:{task_id}", mapping=task_data)
+    pipe.sadd("tasks:all", task_id)
+    pipe.sadd(f"tasks:by_state:{RequestState.OPEN}", task_id)
+    pipe.sadd(
+        f"tasks:by_requester:{task_create.requested_by_user_id}", task_id)
+    await pipe.execute()
 
     return RequestResponse(
         id=task_id,
@@ -168,15 +331,15 @@ async def create_task(task_create: RequestCreate):
         accepted_by_user_id=None,
         time_credit_offer=task_data["time_credit_offer"],
         state=task_data["state"],
-        created_at=now,
-        updated_at=now
+        created_at=_ms_to_datetime(now_ms),
+        updated_at=_ms_to_datetime(now_ms)
     )
 
 
 @app.get("/tasks/{task_id}", response_model=RequestResponse)
 async def get_task(task_id: str):
     """Retrieve a task by ID."""
-    task_data = _get_task_from_redis(task_id)
+    task_data = await _get_task_from_redis(task_id)
     if not task_data:
         logger.info("event=get_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
@@ -186,61 +349,70 @@ async def get_task(task_id: str):
 @app.patch("/tasks/{task_id}", response_model=RequestResponse)
 async def update_task(task_id: str, task_update: RequestUpdate, requested_by_user_id: str = None):
     """Update a task (only allowed while open)."""
-    task_data = _get_task_from_redis(task_id)
-    if not task_data:
+    task_fields = await _get_task_fields(task_id, "state")
+    if not task_fields:
         logger.info("event=update_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task_data["state"] != RequestState.OPEN:
+    if task_fields["state"] != RequestState.OPEN:
         logger.info("event=update_task_not_allowed task_id=%s state=%s",
-                    task_id, task_data["state"])
+                    task_id, task_fields["state"])
         raise HTTPException(
             status_code=400, detail="Can only update tasks in open state")
 
+    updates = {}
     if task_update.title is not None:
-        task_data["title"] = task_update.title
+        updates["title"] = task_update.title
     if task_update.description is not None:
-        task_data["description"] = task_update.description
+        updates["description"] = task_update.description
     if task_update.time_credit_offer is not None:
         if task_update.time_credit_offer <= 0:
             raise HTTPException(
                 status_code=400, detail="Time credit offer must be positive")
-        task_data["time_credit_offer"] = task_update.time_credit_offer
+        updates["time_credit_offer"] = task_update.time_credit_offer
 
-    task_data["updated_at"] = datetime.datetime.now(
-        datetime.timezone.utc).isoformat()
+    updates["updated_at"] = _now_ms()
 
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    logger.info("event=update_task task_id=%s", task_id)
+    pipe = redis_client.pipeline()
+    pipe.hset(f"task:{task_id}", mapping=updates)
+    pipe.hgetall(f"task:{task_id}")
+    task_data = (await pipe.execute())[-1]
+    logger.debug("event=update_task task_id=%s", task_id)
     return _task_dict_to_response(task_id, task_data)
 
 
 @app.get("/tasks", response_model=List[RequestResponse])
 async def list_tasks(
-    state: Optional[str] = None,
+    state: Optional[RequestState] = None,
     requested_by_user_id: Optional[str] = None,
     accepted_by_user_id: Optional[str] = None
 ):
     """List tasks with optional filtering."""
-    all_task_ids = redis_client.smembers("tasks:all")
+    # Resolve filters server-side against the secondary index sets
+    index_keys = []
+    if state:
+        index_keys.append(f"tasks:by_state:{state}")
+    if requested_by_user_id:
+        index_keys.append(f"tasks:by_requester:{requested_by_user_id}")
+    if accepted_by_user_id:
+        index_keys.append(f"tasks:by_acceptor:{accepted_by_user_id}")
 
-    tasks = []
-    for tid in all_task_ids:
-        task_data = _get_task_from_redis(tid)
-        if not task_data:
-            continue
+    if not index_keys:
+        index_keys.append("tasks:all")
 
-        # Apply filters
-        if state and task_data["state"] != state:
-            continue
-        if requested_by_user_id and task_data["requested_by_user_id"] != requested_by_user_id:
-            continue
-        if accepted_by_user_id and task_data.get("accepted_by_user_id") != accepted_by_user_id:
+    # Resolve IDs and fetch every matching task hash in a single round-trip
+    results = await LIST_TASKS_SCRIPT(keys=index_keys)
+
+    tasks = []
+    for tid, fields in zip(results[::2], results[1::2]):
+        if not fields:
             continue
 
+        task_data = dict(zip(fields[::2], fields[1::2]))
         tasks.append(_task_dict_to_response(tid, task_data))
-    logger.info("event=list_tasks returned=%s", len(tasks))
-    return tasks
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("event=list_tasks returned=%s", len(tasks))
+    return ORJSONResponse(_TASK_LIST_ADAPTER.dump_python(tasks, mode="json"))
 
 # State management endpoints
 
@@ -248,7 +420,11 @@ async def list_tasks(
 @app.post("/tasks/{task_id}/accept", response_model=RequestResponse)
 async def accept_task(task_id: str, accept_req: TaskAcceptRequest):
     """Accept a task (transition from open to pending)."""
-    task_data = _get_task_from_redis(task_id)
+    # Fetch the task and validate the acceptor concurrently
+    task_data, acceptor_exists = await asyncio.gather(
+        _get_task_fields(task_id, *_GUARD_FIELDS),
+        _validate_user_exists(accept_req.acceptor_user_id)
+    )
     if not task_data:
         logger.info("event=accept_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
@@ -259,27 +435,30 @@ async def accept_task(task_id: str, accept_req: TaskAcceptRequest):
         raise HTTPException(
             status_code=400, detail="Task must be in open state to accept")
 
-    # Validate acceptor exists
-    if not await _validate_user_exists(accept_req.acceptor_user_id):
+    if not acceptor_exists:
         logger.info("event=accept_task acceptor_not_found user_id=%s",
                     accept_req.acceptor_user_id)
         raise HTTPException(status_code=404, detail="Acceptor user not found")
 
-    task_data["accepted_by_user_id"] = accept_req.acceptor_user_id
-    task_data["state"] = RequestState.PENDING
-    task_data["updated_at"] = datetime.datetime.now(
-        datetime.timezone.utc).isoformat()
-
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    logger.info("event=accept_task task_id=%s acceptor=%s",
-                task_id, accept_req.acceptor_user_id)
+    updates = {
+        "accepted_by_user_id": accept_req.acceptor_user_id,
+        "state": RequestState.PENDING,
+        "updated_at": _now_ms()
+    }
+    task_data = await _save_task_transition(task_id, task_data["state"], updates)
+    if not task_data:
+        logger.info("event=accept_task_conflict task_id=%s", task_id)
+        raise HTTPException(
+            status_code=409, detail="Task was modified concurrently")
+    logger.debug("event=accept_task task_id=%s acceptor=%s",
+                 task_id, accept_req.acceptor_user_id)
     return _task_dict_to_response(task_id, task_data)
 
 
 @app.post("/tasks/{task_id}/start", response_model=RequestResponse)
 async def start_task(task_id: str, start_req: TaskStartRequest):
     """Start a task (transition from pending to in_progress)."""
-    task_data = _get_task_from_redis(task_id)
+    task_data = await _get_task_fields(task_id, *_GUARD_FIELDS)
     if not task_data:
         logger.info("event=start_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
@@ -296,20 +475,24 @@ async def start_task(task_id: str, start_req: TaskStartRequest):
         raise HTTPException(
             status_code=403, detail="Only the acceptor can start the task")
 
-    task_data["state"] = RequestState.IN_PROGRESS
-    task_data["updated_at"] = datetime.datetime.now(
-        datetime.timezone.utc).isoformat()
-
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    logger.info("event=start_task task_id=%s started_by=%s",
-                task_id, start_req.started_by_user_id)
+    updates = {
+        "state": RequestState.IN_PROGRESS,
+        "updated_at": _now_ms()
+    }
+    task_data = await _save_task_transition(task_id, task_data["state"], updates)
+    if not task_data:
+        logger.info("event=start_task_conflict task_id=%s", task_id)
+        raise HTTPException(
+            status_code=409, detail="Task was modified concurrently")
+    logger.debug("event=start_task task_id=%s started_by=%s",
+                 task_id, start_req.started_by_user_id)
     return _task_dict_to_response(task_id, task_data)
 
 
-@app.post("/tasks/{task_id}/complete", response_model=RequestResponse)
+@app.post("/tasks/{task_id}/complete", response_model=RequestResponse, status_code=202)
 async def complete_task(task_id: str, complete_req: TaskCompleteRequest):
-    """Complete a task and transfer credits."""
-    task_data = _get_task_from_redis(task_id)
+    """Complete a task; credits are transferred in the background."""
+    task_data = await _get_task_fields(task_id, *_GUARD_FIELDS)
     if not task_data:
         logger.info("event=complete_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
@@ -326,36 +509,48 @@ async def complete_task(task_id: str, complete_req: TaskCompleteRequest):
         raise HTTPException(
             status_code=403, detail="Only the acceptor can complete the task")
 
-    # Transfer credits
-    transfer_success = await _transfer_credits(
-        from_user_id=task_data["requested_by_user_id"],
-        to_user_id=task_data["accepted_by_user_id"],
-        amount=int(task_data["time_credit_offer"])
-    )
-
-    if not transfer_success:
-        logger.info("event=complete_task_transfer_failed task_id=%s", task_id)
+    # Claim the completion, then hand the credit transfer to the worker
+    updates = {
+        "state": RequestState.COMPLETING,
+        "updated_at": _now_ms()
+    }
+    task_data = await _save_task_transition(
+        task_id, RequestState.IN_PROGRESS, updates)
+    if not task_data:
+        logger.info("event=complete_task_conflict task_id=%s", task_id)
         raise HTTPException(
-            status_code=400, detail="Credit transfer failed - insufficient credits or user not found")
-
-    task_data["state"] = RequestState.COMPLETED
-    task_data["updated_at"] = datetime.datetime.now(
-        datetime.timezone.utc).isoformat()
+            status_code=409, detail="Task was modified concurrently")
 
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    logger.info("event=complete_task task_id=%s", task_id)
+    # Publishing to the broker is blocking, so keep it off the event loop
+    try:
+        await asyncio.to_thread(
+            transfer_and_finalize.delay,
+            task_id,
+            task_data["requested_by_user_id"],
+            task_data["accepted_by_user_id"],
+            int(task_data["time_credit_offer"])
+        )
+    except Exception as e:
+        logger.exception("Error queueing credit transfer: %s", e)
+        await _save_task_transition(task_id, RequestState.COMPLETING, {
+            "state": RequestState.IN_PROGRESS,
+            "updated_at": _now_ms()
+        })
+        raise HTTPException(
+            status_code=503, detail="Credit transfer could not be queued")
+    logger.debug("event=complete_task_queued task_id=%s", task_id)
     return _task_dict_to_response(task_id, task_data)
 
 
 @app.post("/tasks/{task_id}/cancel", response_model=RequestResponse)
 async def cancel_task(task_id: str, cancel_req: TaskCancelRequest):
     """Cancel a task (only by creator, in open or pending state)."""
-    task_data = _get_task_from_redis(task_id)
+    task_data = await _get_task_fields(task_id, *_GUARD_FIELDS)
     if not task_data:
         logger.info("event=cancel_task task_id=%s result=not_found", task_id)
         raise HTTPException(status_code=404, detail="Task not found")
 
-    if task_data["state"] not in [RequestState.OPEN, RequestState.PENDING]:
+    if task_data["state"] not in _CANCELLABLE_STATES:
         logger.info("event=cancel_task_not_allowed task_id=%s state=%s",
                     task_id, task_data["state"])
         raise HTTPException(
@@ -367,11 +562,15 @@ async def cancel_task(task_id: str, cancel_req: TaskCancelRequest):
         raise HTTPException(
             status_code=403, detail="Only the creator can cancel the task")
 
-    task_data["state"] = RequestState.CANCELLED
-    task_data["updated_at"] = datetime.datetime.now(
-        datetime.timezone.utc).isoformat()
-
-    redis_client.hset(f"task:{task_id}", mapping=task_data)
-    logger.info("event=cancel_task task_id=%s cancelled_by=%s reason=%s",
-                task_id, cancel_req.cancelled_by_user_id, cancel_req.reason)
+    updates = {
+        "state": RequestState.CANCELLED,
+        "updated_at": _now_ms()
+    }
+    task_data = await _save_task_transition(task_id, task_data["state"], updates)
+    if not task_data:
+        logger.info("event=cancel_task_conflict task_id=%s", task_id)
+        raise HTTPException(
+            status_code=409, detail="Task was modified concurrently")
+    logger.debug("event=cancel_task task_id=%s cancelled_by=%s reason=%s",
+                 task_id, cancel_req.cancelled_by_user_id, cancel_req.reason)
     return _task_dict_to_response(task_id, task_data)
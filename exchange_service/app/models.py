@@ -1,4 +1,5 @@
 import datetime
+from enum import StrEnum
 from typing import Optional
 
 from pydantic import BaseModel
@@ -17,10 +18,11 @@ class RequestUpdate(BaseModel):
     time_credit_offer: Optional[int] = None
 
 
-class RequestState(str):
+class RequestState(StrEnum):
     OPEN = "open"
     PENDING = "pending"      # accepted but not started
     IN_PROGRESS = "in_progress"
+    COMPLETING = "completing"  # credit transfer queued
     COMPLETED = "completed"
     CANCELLED = "cancelled"
 
@@ -32,7 +34,7 @@ class RequestResponse(BaseModel):
     requested_by_user_id: str
     accepted_by_user_id: Optional[str]
     time_credit_offer: int
-    state: str  # one of RequestState
+    state: RequestState
     created_at: datetime.datetime
     updated_at: datetime.datetime
 
@@ -3,11 +3,12 @@ import logging
 import os
 import uuid
 
-import redis
+import redis.asyncio as redis
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -15,18 +16,34 @@ logging.basicConfig(
     level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 logger = logging.getLogger("feedback_service")
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "redis"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
-)
+# Redis connection pool; a request waits up to REDIS_POOL_TIMEOUT seconds
+# for a free connection before failing
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", 20))
+REDIS_SOCKET_PATH = os.getenv("REDIS_SOCKET_PATH")
+if REDIS_SOCKET_PATH:
+    redis_pool = redis.BlockingConnectionPool(
+        connection_class=redis.UnixDomainSocketConnection,
+        path=REDIS_SOCKET_PATH,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+else:
+    redis_pool = redis.BlockingConnectionPool(
+        host=os.getenv("REDIS_HOST", "redis"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+redis_client = redis.Redis(connection_pool=redis_pool)
 
 # API Endpoints
 
 
 @app.get("/health")
 async def health_check():
-    logger.info("event=health_check service=feedback_service")
     return {
         "service": "feedback_service",
         "status": "healthy",
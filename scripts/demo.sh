@@ -112,9 +112,15 @@ COMPLETE_RESPONSE=$(curl -s -X POST "$EXCHANGE_API/tasks/$UUID_TASK/complete" \
     \"completed_by_user_id\": \"$UUID_BOB\"
   }")
 
-echo -e "${GREEN}✓${NC} Task completed"
 echo "Task state: $(echo "$COMPLETE_RESPONSE" | grep -o '"state":"[^"]*' | cut -d'"' -f4)"
 
+# Credits are transferred by the background worker
+sleep 1
+TASK_RESPONSE=$(curl -s "$EXCHANGE_API/tasks/$UUID_TASK")
+
+echo -e "${GREEN}✓${NC} Task completed"
+echo "Task state: $(echo "$TASK_RESPONSE" | grep -o '"state":"[^"]*' | cut -d'"' -f4)"
+
 echo ""
 echo -e "${BLUE}[Step 6] Checking Final Balances${NC}"
 echo "Retrieving balances..."
@@ -0,0 +1,96 @@
+"""One-off migration for Redis data written before the storage changes.
+
+Safe to re-run. Run it once against an existing redis-data volume, e.g.
+
+    docker-compose run --rm -v "$PWD/scripts:/scripts" exchange_service \
+        python /scripts/migrate_redis.py
+"""
+import datetime
+import os
+
+import redis
+
+redis_client = redis.Redis(
+    host=os.getenv("REDIS_HOST", "redis"),
+    port=int(os.getenv("REDIS_PORT", 6379)),
+    decode_responses=True
+)
+
+
+def _iso_to_ms(value: str) -> int:
+    """Convert a stored ISO-8601 timestamp to epoch milliseconds (UTC if naive)."""
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def _member_ids(key: str) -> list:
+    """Return the IDs in an index key, whether it is a set or a sorted set."""
+    if redis_client.type(key) == "zset":
+        return redis_client.zrange(key, 0, -1)
+    return list(redis_client.smembers(key))
+
+
+def convert_timestamps(ids_key: str, prefix: str, fields: tuple) -> int:
+    """Rewrite ISO-8601 timestamp fields as epoch milliseconds."""
+    count = 0
+    for item_id in _member_ids(ids_key):
+        key = f"{prefix}:{item_id}"
+        values = redis_client.hmget(key, fields)
+        updates = {
+            field: _iso_to_ms(value)
+            for field, value in zip(fields, values)
+            if value and not value.isdigit()
+        }
+        if updates:
+            redis_client.hset(key, mapping=updates)
+            count += 1
+    return count
+
+
+def rebuild_user_index() -> int:
+    """Replace a users:all set with a sorted set scored by created_at."""
+    if redis_client.type("users:all") != "set":
+        return 0
+    scores = {}
+    for user_id in redis_client.smembers("users:all"):
+        created_at = redis_client.hget(f"user:{user_id}", "created_at")
+        if created_at is None:
+            continue
+        scores[user_id] = int(created_at) if created_at.isdigit() else _iso_to_ms(created_at)
+    pipe = redis_client.pipeline()
+    pipe.delete("users:all:rebuild")
+    if scores:
+        pipe.zadd("users:all:rebuild", scores)
+        pipe.rename("users:all:rebuild", "users:all")
+    else:
+        pipe.delete("users:all")
+    pipe.execute()
+    return len(scores)
+
+
+def backfill_task_indexes() -> int:
+    """Add every task in tasks:all to its state, requester and acceptor sets."""
+    count = 0
+    pipe = redis_client.pipeline(transaction=False)
+    for task_id in redis_client.smembers("tasks:all"):
+        state, requested_by, accepted_by = redis_client.hmget(
+            f"task:{task_id}", "state", "requested_by_user_id", "accepted_by_user_id")
+        if state is None:
+            continue
+        pipe.sadd(f"tasks:by_state:{state}", task_id)
+        pipe.sadd(f"tasks:by_requester:{requested_by}", task_id)
+        if accepted_by:
+            pipe.sadd(f"tasks:by_acceptor:{accepted_by}", task_id)
+        count += 1
+    pipe.execute()
+    return count
+
+
+if __name__ == "__main__":
+    tasks = convert_timestamps("tasks:all", "task", ("created_at", "updated_at"))
+    users = convert_timestamps("users:all", "user", ("created_at",))
+    print(f"converted timestamps on {tasks} tasks and {users} users")
+    print(f"indexed {rebuild_user_index()} users")
+    print(f"indexed {backfill_task_indexes()} tasks")
@@ -91,6 +91,7 @@ curl -s -X POST "$EXCHANGE_API/tasks/$TASK1/complete" \
 
 # Test 12: Verify balances after transfer
 echo -e "\n${YELLOW}Test 12: Verify Balances After Transfer${NC}"
+sleep 1  # credits are transferred by the background worker
 echo "Alice's balance:"
 curl -s "$USERS_API/users/$USER1/balance" | jq .
 echo "Bob's balance:"
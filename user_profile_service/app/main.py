@@ -2,11 +2,13 @@ import datetime
 import json
 import logging
 import os
+import time
 import uuid
 
-import redis
+import redis.asyncio as redis
 from fastapi import FastAPI, HTTPException
-from pydantic import ValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
 
 from .models import (
     INITIAL_TIME_CREDITS,
@@ -18,7 +20,7 @@ from .models import (
     UserProfileUpdate,
 )
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -26,33 +28,98 @@ logging.basicConfig(
     level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 logger = logging.getLogger("user_profile_service")
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "redis"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
-)
+# Redis connection pool; a request waits up to REDIS_POOL_TIMEOUT seconds
+# for a free connection before failing
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = int(os.getenv("REDIS_POOL_TIMEOUT", 20))
+REDIS_SOCKET_PATH = os.getenv("REDIS_SOCKET_PATH")
+if REDIS_SOCKET_PATH:
+    redis_pool = redis.BlockingConnectionPool(
+        connection_class=redis.UnixDomainSocketConnection,
+        path=REDIS_SOCKET_PATH,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+else:
+    redis_pool = redis.BlockingConnectionPool(
+        host=os.getenv("REDIS_HOST", "redis"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        decode_responses=True
+    )
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Atomically move credits between two user hashes in one round-trip.
+# Returns -1/-2 if the sender/recipient is missing, -3 on insufficient
+# credits, otherwise the {sender, recipient} balances after the transfer.
+TRANSFER_SCRIPT = redis_client.register_script("""
+local from_credits = redis.call('HGET', KEYS[1], 'time_credits')
+local to_credits = redis.call('HGET', KEYS[2], 'time_credits')
+if not from_credits then return -1 end
+if not to_credits then return -2 end
+local amount = tonumber(ARGV[1])
+if tonumber(from_credits) < amount then return -3 end
+return {
+    redis.call('HINCRBY', KEYS[1], 'time_credits', -amount),
+    redis.call('HINCRBY', KEYS[2], 'time_credits', amount)
+}
+""")
+
+# Built once so list_users can serialize without FastAPI's per-call path
+_USER_LIST_ADAPTER = TypeAdapter(list[UserProfileResponse])
+
+# Return a page of users from the users:all sorted set in one round-trip,
+# as a flat list of alternating user IDs and HGETALL replies.
+LIST_USERS_SCRIPT = redis_client.register_script("""
+local ids = redis.call('ZRANGE', KEYS[1], ARGV[1], ARGV[2])
+local out = {}
+for _, id in ipairs(ids) do
+    out[#out + 1] = id
+    out[#out + 1] = redis.call('HGETALL', 'user:' .. id)
+end
+return out
+""")
 
 # Helper functions
 
 
-def _get_user_from_redis(user_id: str) -> dict:
+async def _get_user_from_redis(user_id: str) -> dict:
     """Retrieve user from Redis by ID."""
-    user_data = redis_client.hgetall(f"user:{user_id}")
+    user_data = await redis_client.hgetall(f"user:{user_id}")
     if not user_data:
         logger.debug("user_not_found user_id=%s", user_id)
         return None
     return user_data
 
 
-def _user_dict_to_response(user_id: str, user_data: dict) -> UserProfileResponse:
-    """Convert Redis hash to UserProfileResponse."""
-    return UserProfileResponse(
+def _now_ms() -> int:
+    """Current UTC time as integer epoch milliseconds, as stored in Redis."""
+    return time.time_ns() // 1_000_000
+
+
+def _ms_to_datetime(ms: str) -> datetime.datetime:
+    """Convert an epoch-millisecond Redis field to a UTC datetime."""
+    return datetime.datetime.fromtimestamp(int(ms) / 1000, tz=datetime.timezone.utc)
+
+
+# Globals are bound as defaults since this runs once per item in list_users
+def _user_dict_to_response(
+    user_id: str,
+    user_data: dict,
+    _construct=UserProfileResponse.model_construct,
+    _to_datetime=_ms_to_datetime,
+    _int=int
+) -> UserProfileResponse:
+    """Convert Redis hash to UserProfileResponse without re-validating it."""
+    return _construct(
         id=user_id,
         name=user_data["name"],
         email=user_data["email"],
         description=user_data.get("description"),
-        time_credits=int(user_data["time_credits"]),
-        created_at=datetime.datetime.fromisoformat(user_data["created_at"])
+        time_credits=_int(user_data["time_credits"]),
+        created_at=_to_datetime(user_data["created_at"])
     )
 
 # API Endpoints
@@ -75,10 +142,10 @@ async def health_check():
 @app.post("/users", response_model=UserProfileResponse)
 async def create_user(user_create: UserProfileCreate):
     """Create a new user profile with initial time credits."""
-    user_id = str(uuid.uuid4())
-    logger.info("event=create_user user_id=%s email=%s",
-                user_id, user_create.email)
-    now = datetime.datetime.now(datetime.timezone.utc)
+    user_id = uuid.uuid4().hex
+    logger.debug("event=create_user user_id=%s email=%s",
+                 user_id, user_create.email)
+    now_ms = _now_ms()
 
     user_data = {
         "id": user_id,
@@ -86,11 +153,13 @@ async def create_user(user_create: UserProfileCreate):
         "email": user_create.email,
         "description": user_create.description or "",
         "time_credits": INITIAL_TIME_CREDITS,
-        "created_at": now.isoformat()
+        "created_at": now_ms
     }
 
-    redis_client.hset(f"user:{user_id}", mapping=user_data)
-    redis_client.sadd("users:all", user_id)
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.hset(f"user:{user_id}", mapping=user_data)
+    pipe.zadd("users:all", {user_id: now_ms})
+    await pipe.execute()
 
     return UserProfileResponse(
         id=user_id,
@@ -98,14 +167,14 @@ async def create_user(user_create: UserProfileCreate):
         email=user_data["email"],
         description=user_data["description"] if user_data["description"] else None,
         time_credits=user_data["time_credits"],
-        created_at=now
+        created_at=_ms_to_datetime(now_ms)
     )
 
 
 @app.get("/users/{user_id}", response_model=UserProfileResponse)
 async def get_user(user_id: str):
     """Retrieve a user profile by ID."""
-    user_data = _get_user_from_redis(user_id)
+    user_data = await _get_user_from_redis(user_id)
     if not user_data:
         logger.info("event=get_user user_id=%s result=not_found", user_id)
         raise HTTPException(status_code=404, detail="User not found")
@@ -115,7 +184,7 @@ async def get_user(user_id: str):
 @app.patch("/users/{user_id}", response_model=UserProfileResponse)
 async def update_user(user_id: str, user_update: UserProfileUpdate):
     """Update user profile information."""
-    user_data = _get_user_from_redis(user_id)
+    user_data = await _get_user_from_redis(user_id)
     if not user_data:
         logger.info("event=update_user user_id=%s result=not_found", user_id)
         raise HTTPException(status_code=404, detail="User not found")
@@ -125,41 +194,42 @@ async def update_user(user_id: str, user_update: UserProfileUpdate):
     if user_update.description is not None:
         user_data["description"] = user_update.description
 
-    redis_client.hset(f"user:{user_id}", mapping=user_data)
-    logger.info("event=update_user user_id=%s", user_id)
+    await redis_client.hset(f"user:{user_id}", mapping=user_data)
+    logger.debug("event=update_user user_id=%s", user_id)
     return _user_dict_to_response(user_id, user_data)
 
 
 @app.get("/users", response_model=list[UserProfileResponse])
 async def list_users(limit: int = 10, offset: int = 0):
     """List all user profiles with pagination."""
-    all_user_ids = redis_client.smembers("users:all")
-    logger.debug("event=list_users limit=%s offset=%s total=%s",
-                 limit, offset, len(all_user_ids))
+    logger.debug("event=list_users limit=%s offset=%s", limit, offset)
+    if limit <= 0:
+        return []
 
-    # Apply offset and limit
-    user_ids = sorted(list(all_user_ids))[offset:offset + limit]
+    # Users are scored by creation time, so Redis pages them in order
+    results = await LIST_USERS_SCRIPT(
+        keys=["users:all"], args=[offset, offset + limit - 1])
 
     users = []
-    for uid in user_ids:
-        user_data = _get_user_from_redis(uid)
-        if user_data:
+    for uid, fields in zip(results[::2], results[1::2]):
+        if fields:
+            user_data = dict(zip(fields[::2], fields[1::2]))
             users.append(_user_dict_to_response(uid, user_data))
 
-    return users
+    return ORJSONResponse(_USER_LIST_ADAPTER.dump_python(users, mode="json"))
 
 
 @app.get("/users/{user_id}/balance", response_model=UserBalanceResponse)
 async def get_user_balance(user_id: str):
     """Get user's current time credit balance."""
-    user_data = _get_user_from_redis(user_id)
-    if not user_data:
+    credits = await redis_client.hget(f"user:{user_id}", "time_credits")
+    if credits is None:
         logger.info("event=get_balance user_id=%s result=not_found", user_id)
         raise HTTPException(status_code=404, detail="User not found")
 
     return UserBalanceResponse(
         id=user_id,
-        time_credits=int(user_data["time_credits"])
+        time_credits=int(credits)
     )
 
 
@@ -173,39 +243,30 @@ async def transfer_credits(transfer: TransferRequest):
         raise HTTPException(
             status_code=400, detail="Transfer amount must be positive")
 
-    # Check both users exist
-    from_user_data = _get_user_from_redis(transfer.from_user_id)
-    if not from_user_data:
+    result = await TRANSFER_SCRIPT(
+        keys=[f"user:{transfer.from_user_id}", f"user:{transfer.to_user_id}"],
+        args=[transfer.amount]
+    )
+
+    if result == -1:
         logger.info(
             "event=transfer_user_not_found which=from user_id=%s", transfer.from_user_id)
         raise HTTPException(status_code=404, detail="From user not found")
-
-    to_user_data = _get_user_from_redis(transfer.to_user_id)
-    if not to_user_data:
+    if result == -2:
         logger.info(
             "event=transfer_user_not_found which=to user_id=%s", transfer.to_user_id)
         raise HTTPException(status_code=404, detail="To user not found")
-
-    # Check sender has enough credits
-    sender_credits = int(from_user_data["time_credits"])
-    if sender_credits < transfer.amount:
-        logger.info("event=transfer_insufficient from=%s available=%s amount=%s",
-                    transfer.from_user_id, sender_credits, transfer.amount)
+    if result == -3:
+        logger.info("event=transfer_insufficient from=%s amount=%s",
+                    transfer.from_user_id, transfer.amount)
         raise HTTPException(status_code=400, detail="Insufficient credits")
 
-    # Update balances
-    from_user_data["time_credits"] = sender_credits - transfer.amount
-    to_user_data["time_credits"] = int(
-        to_user_data["time_credits"]) + transfer.amount
-
-    redis_client.hset(f"user:{transfer.from_user_id}", mapping=from_user_data)
-    redis_client.hset(f"user:{transfer.to_user_id}", mapping=to_user_data)
-
-    logger.info("event=transfer_success from=%s to=%s amount=%s",
-                transfer.from_user_id, transfer.to_user_id, transfer.amount)
+    from_credits, to_credits = result
+    logger.debug("event=transfer_success from=%s to=%s amount=%s",
+                 transfer.from_user_id, transfer.to_user_id, transfer.amount)
     return TransferResponse(
         from_user=UserBalanceResponse(
-            id=transfer.from_user_id, time_credits=int(from_user_data["time_credits"])),
+            id=transfer.from_user_id, time_credits=from_credits),
         to_user=UserBalanceResponse(
-            id=transfer.to_user_id, time_credits=int(to_user_data["time_credits"]))
+            id=transfer.to_user_id, time_credits=to_credits)
     )